@@ -15,21 +15,38 @@ import numpy as np
 import psutil
 import time
 import os
+import copy
+import json
 import sys
 import threading
-from PIL import Image, ImageDraw, ImageFont, ImageOps
+import queue
+from PIL import Image, ImageDraw, ImageFont
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple, Callable
+from collections import OrderedDict, deque, namedtuple
 from dataclasses import dataclass, field
 import yaml
 
 # Importa plugins da pasta plugins
 from plugins import Plugin, ClockPlugin, CPUPlugin, OverlayPlugin, CropPlugin, TLPPlugin, TailPlugin
+from plugins._frame import center_crop_box, resize_interpolation
+
+# Usa o loader em C da libyaml quando disponível (bem mais rápido que o parser em Python puro)
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Cache dos arquivos de configuração já lidos: caminho real -> (mtime, tamanho, dados)
+# Evita reprocessar o YAML quando o mesmo arquivo é carregado novamente sem alterações
+_CONFIG_CACHE: 'OrderedDict[str, Tuple[float, int, dict]]' = OrderedDict()
+_CONFIG_CACHE_SIZE = 32
 
 # ============================================================================
 # CONFIGURAÇÃO
 # ============================================================================
 
+# Fonte declarada em assets.fonts (registro imutável, acessado por atributo)
+FontAsset = namedtuple('FontAsset', 'name path')
+
+
 @dataclass
 class AppConfig:
     """Classe de configuração global da aplicação"""
@@ -39,10 +56,12 @@ class AppConfig:
     device: int = 0
     # Modo de redimensionamento: True = dimensiona para preencher (fit), False = crop (padrão)
     fit: bool = False
+    # Redimensionamento na GPU via OpenCV CUDA (opcional, requer OpenCV compilado com CUDA)
+    gpu: bool = False
     
     # Assets disponíveis (fonts, etc)
     assets: Dict[str, Any] = field(default_factory=lambda: {
-        'fonts': []
+        'fonts': ()
     })
     
     # Nova propriedade para instâncias de plugins
@@ -61,27 +80,49 @@ class AppConfig:
     @classmethod
     def from_yaml(cls, filepath: str) -> 'AppConfig':
         """Carrega configuração de arquivo YAML"""
-        if not os.path.exists(filepath):
+        try:
+            stat = os.stat(filepath)
+        except FileNotFoundError:
             return cls()
         
+        # Reaproveita o conteúdo já lido se o arquivo não mudou (mesmo mtime e tamanho);
+        # a chave é o caminho real, que não depende do diretório atual nem de links
+        cache_key = os.path.realpath(filepath)
+        cached = _CONFIG_CACHE.get(cache_key)
+        if cached is not None and cached[0] == stat.st_mtime and cached[1] == stat.st_size:
+            _CONFIG_CACHE.move_to_end(cache_key)
+            data = cached[2]
+        else:
+            data = cls._load_file(filepath)
+            _CONFIG_CACHE[cache_key] = (stat.st_mtime, stat.st_size, data)
+            _CONFIG_CACHE.move_to_end(cache_key)
+            if len(_CONFIG_CACHE) > _CONFIG_CACHE_SIZE:
+                _CONFIG_CACHE.popitem(last=False)
+        
+        if not data:
+            return cls()
+        
+        # Cópia profunda: o AppConfig guarda referências para dicts aninhados
+        # (assets, plugins) que não podem alterar o conteúdo em cache
+        return cls._parse_config(copy.deepcopy(data))
+    
+    @staticmethod
+    def _load_file(filepath: str) -> dict:
+        """Lê e interpreta o arquivo de configuração"""
         # Determina o tipo pelo extensão
         ext = os.path.splitext(filepath)[1].lower()
         
         with open(filepath, 'r') as f:
-            if ext in ['.yaml', '.yml']:
-                data = yaml.safe_load(f)
-            else:
-                # Tenta YAML como fallback
-                f.seek(0)
-                try:
-                    data = yaml.safe_load(f)
-                except:
-                    data = {}
-        
-        if not data:
-            return cls()
+            if ext in ('.yaml', '.yml'):
+                return yaml.load(f, Loader=_YAML_LOADER)
+            
+            # Extensão desconhecida: decide pelo primeiro caractere não-branco
+            # ('{' ou '[' -> JSON, caso contrário YAML)
+            content = f.read()
         
-        return cls._parse_config(data)
+        if content.lstrip()[:1] in ('{', '['):
+            return json.loads(content)
+        return yaml.load(content, Loader=_YAML_LOADER)
     
     @classmethod
     def _parse_config(cls, data: dict) -> 'AppConfig':
@@ -95,10 +136,11 @@ class AppConfig:
             config.fps = data['camera'].get('fps', config.fps)
             config.device = data['camera'].get('device', config.device)
             config.fit = data['camera'].get('fit', config.fit)
+            config.gpu = data['camera'].get('gpu', config.gpu)
         
         # Assets (fonts, etc)
         if 'assets' in data:
-            config.assets = data['assets']
+            config.assets = cls._parse_assets(data['assets'])
         
         # Keyboard shortcuts
         if 'keyboard_shortcuts' in data:
@@ -112,6 +154,16 @@ class AppConfig:
         
         return config
     
+    @staticmethod
+    def _parse_assets(assets: dict) -> Dict[str, Any]:
+        """Converte assets.fonts em uma tupla de FontAsset"""
+        assets = dict(assets or {})
+        assets['fonts'] = tuple(
+            FontAsset(f.get('name'), f.get('path'))
+            for f in assets.get('fonts') or ()
+        )
+        return assets
+    
     @classmethod
     def _parse_plugin_instances(cls, data: dict) -> List[Dict[str, Any]]:
         """
@@ -155,6 +207,59 @@ class AppConfig:
         return instances
 
 
+def cuda_available() -> bool:
+    """Verifica se o OpenCV tem suporte a CUDA e algum dispositivo disponível"""
+    try:
+        return cv2.cuda.getCudaEnabledDeviceCount() > 0
+    except (AttributeError, cv2.error):
+        return False
+
+
+class CudaResizer:
+    """
+    Redimensiona frames na GPU com cv2.cuda, com a mesma assinatura de cv2.resize.
+    
+    Os GpuMat de origem e destino são reaproveitados entre frames.
+    """
+    
+    def __init__(self):
+        self._src = cv2.cuda_GpuMat()
+        self._dst = cv2.cuda_GpuMat()
+    
+    def __call__(self, frame: np.ndarray, size: Tuple[int, int],
+                 dst: Optional[np.ndarray] = None,
+                 interpolation: int = cv2.INTER_LINEAR) -> np.ndarray:
+        self._src.upload(frame)
+        cv2.cuda.resize(self._src, size, dst=self._dst, interpolation=interpolation)
+        return self._dst.download(dst)
+
+
+def fit_frame(frame: np.ndarray, size: Tuple[int, int],
+              interpolation: Optional[int] = None,
+              dst: Optional[np.ndarray] = None,
+              resize: Callable[..., np.ndarray] = cv2.resize) -> np.ndarray:
+    """
+    Equivalente a ImageOps.fit para arrays NumPy: recorta o centro da imagem
+    na proporção de `size` e redimensiona com OpenCV (`resize` permite usar
+    a GPU, ver CudaResizer).
+    
+    O recorte é uma view do array (sem cópia); apenas o resize escreve memória,
+    diretamente em `dst` se um buffer pré-alocado for informado.
+    """
+    height, width = frame.shape[:2]
+    target_w, target_h = size
+    if (width, height) == (target_w, target_h):
+        return frame
+    
+    x0, y0, x1, y1 = center_crop_box((width, height), (target_w, target_h))
+    frame = frame[y0:y1, x0:x1]
+    
+    if interpolation is None:
+        interpolation = resize_interpolation(x1 - x0, target_w)
+    
+    return resize(frame, (target_w, target_h), dst=dst, interpolation=interpolation)
+
+
 # ============================================================================
 # SISTEMA DE PLUGINS (importados de plugins/)
 # ============================================================================
@@ -171,6 +276,51 @@ class AppConfig:
 # GERENCIADOR DE PLUGINS
 # ============================================================================
 
+class PluginScheduler:
+    """
+    Executa as tarefas periódicas dos plugins (ver Plugin.periodic_tasks).
+    
+    Tarefas com o mesmo intervalo formam uma faixa com um único prazo. O
+    relógio monotônico é lido uma vez por frame e, enquanto nenhuma faixa
+    vence, o custo é uma única comparação, independente do número de plugins.
+    """
+    
+    def __init__(self):
+        # intervalo -> [próximo prazo, [(plugin, função), ...]]
+        self._tiers: Dict[float, list] = {}
+        self._next_due = float('inf')
+    
+    def clear(self):
+        """Remove todas as tarefas"""
+        self._tiers = {}
+        self._next_due = float('inf')
+    
+    def add(self, plugin: Plugin, interval: float, callback: Callable[[], None]):
+        """Agenda `callback` a cada `interval` segundos enquanto o plugin estiver habilitado"""
+        tier = self._tiers.get(interval)
+        if tier is None:
+            tier = self._tiers[interval] = [time.monotonic() + interval, []]
+        tier[1].append((plugin, callback))
+        self._next_due = min(self._next_due, tier[0])
+    
+    def run_pending(self):
+        """Executa as faixas cujo prazo venceu"""
+        now = time.monotonic()
+        if now < self._next_due:
+            return
+        
+        next_due = float('inf')
+        for interval, tier in self._tiers.items():
+            if now >= tier[0]:
+                for plugin, callback in tier[1]:
+                    if plugin.enabled:
+                        callback()
+                # Próximo prazo a partir de agora (execuções perdidas não se acumulam)
+                tier[0] = now + interval
+            next_due = min(next_due, tier[0])
+        self._next_due = next_due
+
+
 class PluginManager:
     """Gerencia todos os plugins carregados"""
     
@@ -187,6 +337,15 @@ class PluginManager:
     def __init__(self, app_config: AppConfig):
         self.app_config = app_config
         self.plugins: Dict[str, Plugin] = {}
+        # Plugins separados no registro: crop/transformações rodam antes dos demais
+        self._pre_plugins: List[Plugin] = []
+        self._post_plugins: List[Plugin] = []
+        # False quando nenhum plugin vai alterar o frame (recalculado só quando muda)
+        self._active = False
+        # Índice tecla -> plugins que têm atalho nessa tecla (evita consultar todos os plugins)
+        self._key_map: Dict[str, List[Plugin]] = {}
+        # Tarefas periódicas dos plugins (releitura de arquivos etc.)
+        self.scheduler = PluginScheduler()
         self.filter_plugins: List[Plugin] = []
         self.current_filter_index = 0
     
@@ -203,8 +362,43 @@ class PluginManager:
             counter += 1
         
         self.plugins[instance_id] = plugin
+        if plugin.name == 'crop':
+            self._pre_plugins.append(plugin)
+        else:
+            self._post_plugins.append(plugin)
+        self._update_active()
+        self._build_key_map()
+        self._build_schedule()
         print(f"Plugin registrado: {plugin.name} (ID: {instance_id})")
     
+    def _update_active(self):
+        """Recalcula se algum plugin precisa processar os frames"""
+        self._active = bool(self._pre_plugins) or any(p.enabled for p in self._post_plugins)
+    
+    def _build_key_map(self):
+        """Reconstrói o índice de atalhos (tecla -> plugins)"""
+        key_map: Dict[str, List[Plugin]] = {}
+        for plugin in self.plugins.values():
+            if not plugin.shortcuts:
+                continue
+            plugin_keys = set()
+            for shortcut_key in plugin.shortcuts.values():
+                try:
+                    plugin_keys.add(shortcut_key)
+                except TypeError:
+                    # Ex.: lista no YAML; nunca casaria com uma tecla
+                    print(f"Aviso: atalho inválido {shortcut_key!r} no plugin {plugin.name}, ignorando.")
+            for shortcut_key in plugin_keys:
+                key_map.setdefault(shortcut_key, []).append(plugin)
+        self._key_map = key_map
+    
+    def _build_schedule(self):
+        """Reagenda as tarefas periódicas de todos os plugins"""
+        self.scheduler.clear()
+        for plugin in self.plugins.values():
+            for interval, callback in plugin.periodic_tasks():
+                self.scheduler.add(plugin, interval, callback)
+    
     def register_filter(self, plugin: Plugin):
         """Registra um plugin como filtro"""
         self.filter_plugins.append(plugin)
@@ -224,6 +418,9 @@ class PluginManager:
         if not plugin_instances:
             # Fallback para o comportamento antigo
             self._initialize_legacy_plugins()
+            self._update_active()
+            self._build_key_map()
+            self._build_schedule()
             return True
         
         # Cria instâncias de plugins baseadas na configuração
@@ -251,6 +448,10 @@ class PluginManager:
                 print(f"Erro ao inicializar plugin {plugin_type} (ID: {instance_id}): {e}")
                 return False
         
+        # Atalhos e intervalos são definidos no initialize de cada plugin
+        self._update_active()
+        self._build_key_map()
+        self._build_schedule()
         return True
     
     def _initialize_legacy_plugins(self):
@@ -278,18 +479,16 @@ class PluginManager:
     
     def process_frame(self, frame: Image.Image) -> Image.Image:
         """Processa um frame através de todos os plugins"""
-        # Procura por plugin de crop
-        crop_plugin = None
-        crop_plugin_name = None
-        for name, plugin in self.plugins.items():
-            if plugin.name == 'crop':
-                crop_plugin = plugin
-                crop_plugin_name = name
-                break
+        # Nada a desenhar: devolve o frame sem tocar nele
+        if not self._active:
+            return frame
+        
+        # Tarefas periódicas vencidas (uma leitura do relógio por frame)
+        self.scheduler.run_pending()
         
         # Primeiro aplica crop/transformações
-        if crop_plugin:
-            frame = crop_plugin.process_frame(frame, None)
+        for plugin in self._pre_plugins:
+            frame = plugin.process_frame(frame, None)
         
         # Calculate delta_time once (outside the loop for efficiency)
         fps = getattr(self.app_config, 'fps', None)
@@ -298,15 +497,18 @@ class PluginManager:
         delta_time = 1.0 / fps
         
         # Aplica plugins na ordem (exceto crop que já foi)
-        # Note: draw object is created inside the loop so each plugin gets
-        # a fresh draw object compatible with its current frame mode (RGB/RGBA)
-        for name, plugin in self.plugins.items():
-            if name == crop_plugin_name or not plugin.enabled:
+        # O draw object é reaproveitado entre plugins e só é recriado quando um
+        # plugin devolve outro frame ou muda o modo (ex.: conversão para RGBA)
+        draw = None
+        draw_frame = None
+        for plugin in self._post_plugins:
+            if not plugin.enabled:
                 continue
             # Call update for plugins that need periodic updates
             plugin.update(delta_time)
-            # Create fresh draw object for each plugin (handles RGBA conversion properly)
-            draw = ImageDraw.Draw(frame)
+            if frame is not draw_frame or frame.mode != draw.mode:
+                draw = ImageDraw.Draw(frame)
+                draw_frame = frame
             frame = plugin.process_frame(frame, draw)
         
         return frame
@@ -315,11 +517,15 @@ class PluginManager:
         """Propaga eventos de teclado para plugins"""
         handled = False
         
-        # Primeiro verifica plugins
-        for plugin in self.plugins.values():
+        # Primeiro verifica plugins (somente os que têm atalho nessa tecla)
+        for plugin in self._key_map.get(key, ()):
             if plugin.on_keypress(key):
                 handled = True
         
+        # Atalhos podem ter habilitado/desabilitado plugins
+        if handled:
+            self._update_active()
+        
         # Atalhos globais
         if key == self.app_config.keyboard_shortcuts.get('quit', 'q'):
             return 'quit'
@@ -350,8 +556,8 @@ class KeyboardHandler:
     """Gerencia entrada de teclado de forma não-bloqueante"""
     
     def __init__(self):
-        self.key_queue = []
-        self.lock = threading.Lock()
+        # deque: append/popleft são atômicos no CPython, dispensando lock
+        self.key_queue: deque = deque()
     
     def start(self):
         """Inicia o listener de teclado em thread separada"""
@@ -373,8 +579,7 @@ class KeyboardHandler:
                 try:
                     ch = sys.stdin.read(1)
                     if ch:
-                        with self.lock:
-                            self.key_queue.append(ch)
+                        self.key_queue.append(ch)
                 except:
                     break
         finally:
@@ -382,16 +587,108 @@ class KeyboardHandler:
     
     def get_key(self) -> Optional[str]:
         """Retorna a próxima tecla pressionada (não-bloqueante)"""
-        with self.lock:
-            if self.key_queue:
-                return self.key_queue.pop(0)
-        return None
+        try:
+            return self.key_queue.popleft()
+        except IndexError:
+            return None
     
     def stop(self):
         """Para o listener"""
         self.running = False
 
 
+# ============================================================================
+# CAPTURA DE VÍDEO
+# ============================================================================
+
+class CaptureThread:
+    """
+    Captura frames da webcam em thread separada.
+    
+    O cap.read() bloqueia esperando o próximo frame da câmera; rodando em
+    paralelo, o loop principal processa o frame anterior nesse intervalo.
+    Só o frame mais recente fica disponível (frames antigos são descartados)
+    e os buffers são reaproveitados entre frames.
+    """
+    
+    def __init__(self, cap: cv2.VideoCapture, num_buffers: int = 3):
+        self.cap = cap
+        self.running = False
+        self.thread: Optional[threading.Thread] = None
+        # Frames descartados por não terem sido consumidos a tempo
+        self.dropped = 0
+        # Frame mais recente capturado (None sinaliza erro de captura)
+        self._frames: queue.Queue = queue.Queue(maxsize=1)
+        # Buffers livres: um sendo escrito, um na fila e um em uso no loop principal
+        # (começam vazios e são alocados pelo OpenCV na primeira leitura)
+        self._free: queue.Queue = queue.Queue()
+        for _ in range(num_buffers):
+            self._free.put(None)
+    
+    def start(self):
+        """Inicia a captura em thread separada"""
+        self.running = True
+        self.thread = threading.Thread(target=self._capture_loop, daemon=True)
+        self.thread.start()
+    
+    def _capture_loop(self):
+        """Thread que lê frames da câmera"""
+        try:
+            while self.running:
+                buffer = self._free.get()
+                ret, frame = self.cap.read(buffer)
+                if not ret:
+                    frame = None
+                    self.running = False
+                self._publish(frame)
+        finally:
+            # Exceção no backend (ex.: dispositivo perdido): sinaliza erro ao
+            # loop principal em vez de deixá-lo esperando para sempre
+            if self.running:
+                self.running = False
+                self._publish(None)
+    
+    def _publish(self, frame: Optional[np.ndarray]):
+        """Disponibiliza o frame, substituindo o anterior ainda não consumido"""
+        try:
+            self._frames.put_nowait(frame)
+        except queue.Full:
+            # Descarta o frame antigo ainda não consumido e devolve seu buffer
+            try:
+                self._free.put(self._frames.get_nowait())
+                self.dropped += 1
+            except queue.Empty:
+                pass
+            self._frames.put_nowait(frame)
+    
+    def read(self, timeout: float = 2.0) -> Optional[np.ndarray]:
+        """
+        Retorna o frame mais recente (BGR) ou None em caso de erro.
+        
+        Como o cap.read() direto, espera enquanto a captura estiver rodando:
+        câmera lenta para iniciar ou travada por mais que `timeout` não é erro.
+        """
+        while True:
+            try:
+                return self._frames.get(timeout=timeout)
+            except queue.Empty:
+                # Captura encerrada sem frame pendente: erro ou parada
+                if not self.running:
+                    return None
+    
+    def release(self, frame: np.ndarray):
+        """Devolve o buffer de um frame já consumido para reutilização"""
+        self._free.put(frame)
+    
+    def stop(self):
+        """Para a captura"""
+        self.running = False
+        # Desbloqueia a thread caso esteja esperando um buffer livre
+        self._free.put(None)
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+
+
 # ============================================================================
 # CLASSE PRINCIPAL
 # ============================================================================
@@ -405,6 +702,14 @@ class OverlayX:
         self.keyboard_handler = KeyboardHandler()
         self.paused = False
         self.running = False
+        
+        # Latência média de processamento por frame (média móvel exponencial, em segundos)
+        self._ewma_latency = 0.0
+        
+        # Buffers reutilizados a cada frame (evita realocar width*height*3 bytes por frame)
+        self._out_bgr: Optional[np.ndarray] = None
+        # Função de redimensionamento (cv2.resize ou CudaResizer)
+        self._resize: Callable[..., np.ndarray] = cv2.resize
     
     def initialize(self) -> bool:
         """Inicializa a aplicação"""
@@ -417,6 +722,17 @@ class OverlayX:
             print("Erro ao inicializar plugins")
             return False
         
+        # Pré-aloca o buffer de saída no tamanho final da câmera virtual
+        self._out_bgr = np.empty((self.config.height, self.config.width, 3), dtype=np.uint8)
+        
+        # Redimensionamento na GPU, se habilitado e disponível
+        if self.config.gpu:
+            if cuda_available():
+                self._resize = CudaResizer()
+                print("Redimensionamento na GPU (CUDA) ativado")
+            else:
+                print("Aviso: 'gpu' habilitado, mas nenhum dispositivo CUDA disponível. Usando CPU.")
+        
         # Inicia teclado
         self.keyboard_handler.start()
         
@@ -441,21 +757,46 @@ class OverlayX:
             print("Erro: Não foi possível abrir a câmera")
             return
         
+        # Captura em paralelo ao processamento dos frames
+        capture = CaptureThread(cap)
+        capture.start()
+        
         try:
             with pyvirtualcam.Camera(
                 width=target_size[0], 
                 height=target_size[1], 
-                fps=self.config.fps
+                fps=self.config.fps,
+                fmt=pyvirtualcam.PixelFormat.BGR
             ) as cam:
+                # Referências locais para o loop principal (evita buscas de atributo por frame)
+                get_key = self.keyboard_handler.get_key
+                on_keypress = self.plugin_manager.on_keypress
+                process_frame = self.plugin_manager.process_frame
+                read = capture.read
+                release = capture.release
+                send = cam.send
+                sleep = cam.sleep_until_next_frame
+                pause_key = self.config.keyboard_shortcuts.get('pause', ' ')
+                fit = self.config.fit
+                out_bgr = self._out_bgr
+                # Imagem PIL de entrada, redecodificada a cada frame (recriada só se o tamanho mudar)
+                in_img = Image.new('RGB', target_size)
+                resize = self._resize
+                perf_counter = time.perf_counter
+                
+                # Orçamento de tempo por frame (com 10% de folga) e controle do aviso de atraso
+                frame_budget = 1.1 / self.config.fps
+                last_warning = 0.0
+                
                 while self.running:
                     # Verifica teclas
-                    key = self.keyboard_handler.get_key()
+                    key = get_key()
                     if key:
-                        result = self.plugin_manager.on_keypress(key)
+                        result = on_keypress(key)
                         if result == 'quit':
                             break
                         
-                        if key == self.config.keyboard_shortcuts.get('pause', ' '):
+                        if key == pause_key:
                             self.paused = not self.paused
                             print(f"{'Pausado' if self.paused else 'Retomado'}")
                     
@@ -464,37 +805,42 @@ class OverlayX:
                         continue
                     
                     # Captura frame
-                    ret, frame = cap.read()
-                    if not ret:
+                    captured = read()
+                    if captured is None:
                         print("Erro ao capturar frame")
                         break
-                    
-                    # Converte BGR -> RGB
-                    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                    img = Image.fromarray(frame_rgb)
+                    frame = captured
+                    t0 = perf_counter()
                     
                     # Aplica modo de redimensionamento baseado na configuração 'fit'
-                    target_size = (self.config.width, self.config.height)
-                    if self.config.fit:
+                    # (feito no array BGR com OpenCV, antes de criar a imagem PIL)
+                    if fit:
                         # fit=True: dimensiona a imagem para preencher completamente a saída
                         # (mantém aspect ratio, pode adicionar letterbox/pillarbox)
-                        img = ImageOps.fit(img, target_size, Image.Resampling.LANCZOS)
+                        frame = fit_frame(frame, target_size, dst=out_bgr, resize=resize)
                     else:
                         # fit=False (padrão): 
                         # - Se a imagem da webcam for maior que a saída: faz crop do centro
                         # - Se a imagem da webcam for menor ou igual: mantém o tamanho original
-                        if img.width > target_size[0] or img.height > target_size[1]:
+                        if frame.shape[1] > target_size[0] or frame.shape[0] > target_size[1]:
                             # Faz crop do centro para caber na resolução de saída
-                            img = ImageOps.fit(img, target_size, Image.Resampling.LANCZOS)
+                            frame = fit_frame(frame, target_size, dst=out_bgr, resize=resize)
                         # Caso contrário, mantém o tamanho original da webcam
                     
+                    # Decodifica BGR -> RGB direto na imagem PIL persistente
+                    # (sem cv2.cvtColor, buffer intermediário nem imagem nova)
+                    size = (frame.shape[1], frame.shape[0])
+                    if in_img.size != size:
+                        in_img = Image.new('RGB', size)
+                    in_img.frombytes(frame, 'raw', 'BGR')
+                    img = in_img
+                    
+                    # O frame capturado já foi copiado, o buffer pode voltar para a captura
+                    release(captured)
+                    
                     # Processa através dos plugins
                     # (plugins que precisam de tamanho específico podem redimensionar internamente)
-                    img = self.plugin_manager.process_frame(img)
-                    
-                    # Garante que o frame final tem o tamanho correto para a câmera virtual
-                    if img.size != target_size:
-                        img = img.resize(target_size, Image.Resampling.LANCZOS)
+                    img = process_frame(img)
                     
                     # Convert RGBA to RGB for virtual camera compatibility
                     # (composite with black background to preserve visual appearance)
@@ -503,14 +849,36 @@ class OverlayX:
                         background.paste(img, mask=img.split()[3])  # Use alpha as mask
                         img = background
                     
-                    # Envia para câmera virtual
-                    final_frame = np.array(img)
-                    cam.send(final_frame)
-                    cam.sleep_until_next_frame()
+                    # Envia para câmera virtual (em BGR, convertido na própria serialização;
+                    # o Pillow não serializa em buffer existente, então esta é a única
+                    # cópia do frame inteiro alocada por frame)
+                    final_frame = np.frombuffer(img.tobytes('raw', 'BGR'), dtype=np.uint8)
+                    final_frame = final_frame.reshape(img.height, img.width, 3)
+                    
+                    # Garante que o frame final tem o tamanho correto para a câmera virtual
+                    if img.size != target_size:
+                        final_frame = resize(
+                            final_frame, target_size, dst=out_bgr,
+                            interpolation=resize_interpolation(img.width, target_size[0])
+                        )
+                    
+                    send(final_frame)
+                    
+                    # Mede a latência de processamento e avisa (no máximo a cada 5s)
+                    # se estiver acima do orçamento do frame
+                    t1 = perf_counter()
+                    self._ewma_latency = 0.9 * self._ewma_latency + 0.1 * (t1 - t0)
+                    if self._ewma_latency > frame_budget and t1 - last_warning > 5.0:
+                        print(f"Aviso: processamento lento ({self._ewma_latency * 1000:.1f} ms/frame, "
+                              f"{capture.dropped} frames descartados)")
+                        last_warning = t1
+                    
+                    sleep()
         
         except KeyboardInterrupt:
             print("\nEncerrando...")
         finally:
+            capture.stop()
             cap.release()
             self.cleanup()
     
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+"""
+OverlayX - Frame Helpers
+=============================
+Recorte central e escolha de interpolação compartilhados pelo pipeline
+(fit_frame) e pelo CropPlugin, para que os dois redimensionamentos sigam
+a mesma regra.
+
+Autor: OverlayX
+"""
+
+from typing import Tuple
+import cv2
+
+
+def resize_interpolation(src_width: int, dst_width: int,
+                         upscale: int = cv2.INTER_LINEAR) -> int:
+    """Escolhe a interpolação do OpenCV: INTER_AREA para reduzir, `upscale` para ampliar"""
+    return cv2.INTER_AREA if src_width > dst_width else upscale
+
+
+def center_crop_box(size: Tuple[int, int],
+                    target_size: Tuple[int, int]) -> Tuple[int, int, int, int]:
+    """
+    Recorte central (x0, y0, x1, y1) de uma imagem de tamanho `size` na
+    proporção de `target_size` (como ImageOps.fit).
+    """
+    width, height = size
+    target_w, target_h = target_size
+    target_ratio = target_w / target_h
+    if width / height > target_ratio:
+        # Imagem mais larga que a saída: recorta as laterais
+        crop_w = round(height * target_ratio)
+        x0 = (width - crop_w) // 2
+        return (x0, 0, x0 + crop_w, height)
+    # Imagem mais alta que a saída: recorta em cima e embaixo
+    crop_h = round(width / target_ratio)
+    y0 = (height - crop_h) // 2
+    return (0, y0, width, y0 + crop_h)
@@ -8,20 +8,50 @@ Autor: OverlayX
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
-from PIL import Image, ImageDraw
+from dataclasses import fields
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Any, Optional, List, Tuple, Callable
+from PIL import Image, ImageDraw, ImageFont
+
+
+# Config vazia compartilhada (somente leitura) dos plugins criados sem config
+_EMPTY_CONFIG = MappingProxyType({})
+
+
+@lru_cache(maxsize=32)
+def cached_truetype(path: str, size: int) -> ImageFont.FreeTypeFont:
+    """
+    ImageFont.truetype com cache compartilhado entre plugins e instâncias:
+    a mesma fonte no mesmo tamanho é carregada (e a face FreeType alocada)
+    uma única vez. Falhas não são guardadas no cache.
+    """
+    return ImageFont.truetype(path, size)
 
 
 class Plugin(ABC):
     """Classe base para todos os plugins"""
     
+    # Atributos comuns em slots: subclasses que também declaram __slots__
+    # ficam sem __dict__ (as demais continuam com atributos dinâmicos)
+    __slots__ = ('name', 'config', 'enabled', 'app_config', 'shortcuts')
+    
     def __init__(self, name: str, config: Optional[Dict[str, Any]] = None):
         self.name = name
-        self.config = config or {}
+        self.config = config if config is not None else _EMPTY_CONFIG
         # show_by_default: if True, plugin starts visible; if False, starts hidden
         self.enabled = config.get('show_by_default', True) if config else True
         self.app_config = None
-        self.shortcuts = config.get('shortcuts', {}) if config else {}
+        # `shortcuts:` vazio no YAML chega como None
+        self.shortcuts = (config.get('shortcuts') if config else None) or {}
+    
+    def _parse_config(self, schema: type):
+        """
+        Constrói o dataclass `schema` a partir da config do plugin: cada campo
+        recebe o valor da chave de mesmo nome ou o default do dataclass.
+        """
+        names = {f.name for f in fields(schema)}
+        return schema(**{key: value for key, value in self.config.items() if key in names})
     
     @abstractmethod
     def initialize(self, app_config) -> bool:
@@ -63,6 +93,15 @@ class Plugin(ABC):
         """Atualiza o estado do plugin (chamado a cada frame)"""
         pass
     
+    def periodic_tasks(self) -> List[Tuple[float, Callable[[], None]]]:
+        """
+        Tarefas periódicas do plugin: lista de (intervalo em segundos, função).
+        
+        Executadas pelo PluginScheduler enquanto o plugin estiver habilitado,
+        sem que cada plugin precise checar o tempo a cada frame.
+        """
+        return []
+    
     def cleanup(self):
         """Limpa recursos do plugin"""
         pass
@@ -8,11 +8,44 @@ Autor: OverlayX
 """
 
 import os
-from typing import Optional, Dict, Any
+import re
+import time
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, Tuple, Callable
 from datetime import datetime, timezone
 from PIL import Image, ImageDraw, ImageFont
 
-from .base import Plugin
+from .base import Plugin, cached_truetype
+
+
+# Formatos mais comuns formatados diretamente (evita percorrer o formato no strftime)
+_FAST_FORMATTERS: Dict[str, Callable[[datetime], str]] = {
+    '%H:%M:%S': lambda dt: f"{dt.hour:02d}:{dt.minute:02d}:{dt.second:02d}",
+    '%H:%M': lambda dt: f"{dt.hour:02d}:{dt.minute:02d}",
+    '%Y-%m-%d %H:%M:%S': lambda dt: (
+        f"{dt.year:04d}-{dt.month:02d}-{dt.day:02d} "
+        f"{dt.hour:02d}:{dt.minute:02d}:{dt.second:02d}"
+    ),
+}
+
+# Dígitos trocados por '8' (largura típica máxima) ao medir o fundo do relógio
+_DIGITS = re.compile(r'\d')
+
+
+@dataclass
+class ClockConfig:
+    """Opções do plugin clock (None: usa a configuração global, se houver)"""
+    format: str = "%H:%M:%S"
+    # None (hora local), 'local', 'UTC', 'America/Sao_Paulo', etc.
+    timezone: Optional[str] = None
+    position: Optional[Tuple[int, int]] = None
+    font_size: Optional[int] = None
+    show: Optional[bool] = None
+    show_by_default: Optional[bool] = None
+    
+    def __post_init__(self):
+        if self.position is not None:
+            self.position = tuple(self.position)
 
 
 class ClockPlugin(Plugin):
@@ -26,32 +59,52 @@ class ClockPlugin(Plugin):
         self.font_size = 35
         self.show = True
         self.timezone = None  # Timezone specification (e.g., 'UTC', 'America/Sao_Paulo', or None for local)
+        
+        # Cache do relógio renderizado (fundo + texto), refeito só quando o texto muda
+        self._last_text: Optional[str] = None
+        self._sprite: Optional[Image.Image] = None
+        self._sprite_pos: Optional[Tuple[int, int]] = None
+        self._padding_rect: Optional[Tuple[int, int, int, int]] = None
+        # Fundo medido por texto normalizado (dígitos -> '8')
+        self._box_cache: Dict[str, Tuple[int, int, int, int]] = {}
+        
+        # Cache do texto formatado: o strftime só muda uma vez por segundo
+        self._cached_sec = -1
+        self._cached_str = ""
+        self._cache_by_second = True
+        self._formatter: Optional[Callable[[datetime], str]] = None
     
     def initialize(self, app_config) -> bool:
         super().initialize(app_config)
         
-        self.format_str = self.config.get('format', self.format_str)
+        cfg = self._parse_config(ClockConfig)
+        self.format_str = cfg.format
+        
+        # Formatos com frações de segundo (%f) mudam a cada frame e não podem ser cacheados
+        self._cache_by_second = '%f' not in self.format_str
+        # Formatador direto para formatos comuns; os demais usam strftime
+        self._formatter = _FAST_FORMATTERS.get(self.format_str)
         
         # Timezone configuration (optional)
         # Can be: None (local time), 'UTC', 'America/Sao_Paulo', etc.
-        self.timezone = self.config.get('timezone', None)
+        self.timezone = cfg.timezone
         
         # Usa posição da própria config do plugin, se disponível
         # Caso contrário, usa as configurações globais (para compatibilidade)
-        if 'position' in self.config:
-            self.position = tuple(self.config['position'])
+        if cfg.position is not None:
+            self.position = cfg.position
         elif hasattr(app_config, 'clock_position'):
             self.position = app_config.clock_position
         
-        if 'font_size' in self.config:
-            self.font_size = self.config['font_size']
+        if cfg.font_size is not None:
+            self.font_size = cfg.font_size
         elif hasattr(app_config, 'clock_font_size'):
             self.font_size = app_config.clock_font_size
         
-        if 'show' in self.config:
-            self.show = self.config['show']
-        elif 'show_by_default' in self.config:
-            self.show = self.config['show_by_default']
+        if cfg.show is not None:
+            self.show = cfg.show
+        elif cfg.show_by_default is not None:
+            self.show = cfg.show_by_default
         elif hasattr(app_config, 'show_clock'):
             self.show = app_config.show_clock
         else:
@@ -60,8 +113,32 @@ class ClockPlugin(Plugin):
         # Carrega fonte - primeiro tenta usar configuração do plugin, depois assets
         self.font = self._load_font(app_config)
         
+        self._box_cache = {}
+        self._update_box(self._get_current_time().strftime(self.format_str))
+        
         return True
     
+    def _update_box(self, hora_str: str):
+        """
+        Define o fundo para o texto. A medida usa '8' no lugar de cada dígito
+        (largura típica máxima), então só é refeita quando a parte não numérica
+        muda (nomes de dia e mês, por exemplo).
+        """
+        sample = _DIGITS.sub('8', hora_str)
+        rect = self._box_cache.get(sample)
+        if rect is None:
+            padding = 5
+            left, top, right, bottom = self.font.getbbox(sample)
+            x, y = self.position
+            rect = (x + left - padding, y + top - padding,
+                    x + right + padding, y + bottom + padding)
+            # Limita o cache (formatos com muitos textos distintos)
+            if len(self._box_cache) >= 64:
+                self._box_cache.clear()
+            self._box_cache[sample] = rect
+        self._padding_rect = rect
+        self._sprite_pos = rect[:2]
+    
     def _load_font(self, app_config) -> ImageFont.ImageFont:
         """Carrega fonte a partir da configuração do plugin ou assets"""
         font = None
@@ -69,7 +146,7 @@ class ClockPlugin(Plugin):
         # 1. Tenta carregar de caminho direto especificado no plugin config
         if 'font_path' in self.config:
             try:
-                font = ImageFont.truetype(self.config['font_path'], self.font_size)
+                font = cached_truetype(self.config['font_path'], self.font_size)
                 return font
             except:
                 pass
@@ -77,21 +154,21 @@ class ClockPlugin(Plugin):
         # 2. Tenta encontrar por nome nos assets
         if 'font' in self.config and hasattr(app_config, 'assets'):
             font_name = self.config['font']
-            fonts_list = app_config.assets.get('fonts', [])
+            fonts_list = app_config.assets.get('fonts', ())
             for f in fonts_list:
-                if f.get('name') == font_name:
+                if f.name == font_name:
                     try:
-                        font = ImageFont.truetype(f.get('path'), self.font_size)
+                        font = cached_truetype(f.path, self.font_size)
                         return font
                     except:
                         pass
         
         # 3. Fallback para fonte padrão do sistema
         try:
-            font = ImageFont.truetype("/System/Library/Fonts/SFNS.ttf", self.font_size)
+            font = cached_truetype("/System/Library/Fonts/SFNS.ttf", self.font_size)
         except:
             try:
-                font = ImageFont.truetype("/System/Library/Fonts/Menlo.ttc", self.font_size)
+                font = cached_truetype("/System/Library/Fonts/Menlo.ttc", self.font_size)
             except:
                 font = ImageFont.load_default()
         
@@ -143,24 +220,50 @@ class ClockPlugin(Plugin):
         
         return datetime.now(tz)
     
+    def _render_sprite(self, hora_str: str, mode: str):
+        """
+        Renderiza o fundo e o texto do relógio em uma imagem pequena no mesmo
+        modo do frame, que é colada a cada frame. A rasterização do texto
+        acontece só quando o texto muda.
+        """
+        self._update_box(hora_str)
+        x1, y1, x2, y2 = self._padding_rect
+        x, y = self.position
+        
+        sprite = Image.new(mode, (x2 - x1 + 1, y2 - y1 + 1))
+        sprite_draw = ImageDraw.Draw(sprite)
+        
+        # Fundo semi-transparente
+        sprite_draw.rectangle([0, 0, x2 - x1, y2 - y1], fill=(0, 0, 0, 100))
+        
+        # Texto
+        sprite_draw.text((x - x1, y - y1), hora_str, font=self.font, fill=(255, 255, 255, 255))
+        
+        self._last_text = hora_str
+        self._sprite = sprite
+    
     def process_frame(self, frame: Image.Image, draw: ImageDraw.Draw) -> Image.Image:
         if not self.show:
             return frame
         
         # Get current time, handling timezone if specified
-        now = self._get_current_time()
-        hora_str = now.strftime(self.format_str)
+        # (reaproveita o texto enquanto estiver no mesmo segundo)
+        now_sec = int(time.time())
+        if self._cache_by_second and now_sec == self._cached_sec:
+            hora_str = self._cached_str
+        else:
+            now = self._get_current_time()
+            if self._formatter is not None:
+                hora_str = self._formatter(now)
+            else:
+                hora_str = now.strftime(self.format_str)
+            self._cached_sec = now_sec
+            self._cached_str = hora_str
         
-        # Fundo semi-transparente
-        bbox = draw.textbbox(self.position, hora_str, font=self.font)
-        padding = 5
-        draw.rectangle(
-            [bbox[0] - padding, bbox[1] - padding, bbox[2] + padding, bbox[3] + padding],
-            fill=(0, 0, 0, 100)
-        )
+        if hora_str != self._last_text or self._sprite.mode != frame.mode:
+            self._render_sprite(hora_str, frame.mode)
         
-        # Texto
-        draw.text(self.position, hora_str, font=self.font, fill=(255, 255, 255, 255))
+        frame.paste(self._sprite, self._sprite_pos)
         
         return frame
     
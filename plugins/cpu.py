@@ -7,62 +7,131 @@ Plugin que exibe o uso de CPU do sistema.
 Autor: OverlayX
 """
 
+import threading
 import time
 import psutil
-from typing import Optional, Dict, Any
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, Tuple
 from PIL import Image, ImageDraw, ImageFont
 
 from .base import Plugin
 
 
+@dataclass
+class CPUConfig:
+    """Opções do plugin cpu (None: usa a configuração global, se houver)"""
+    update_interval: float = 2.0
+    position: Optional[Tuple[int, int]] = None
+    font_size: Optional[int] = None
+    show: Optional[bool] = None
+    show_by_default: Optional[bool] = None
+    show_system: bool = True
+    
+    def __post_init__(self):
+        if self.position is not None:
+            self.position = tuple(self.position)
+
+
 class CPUPlugin(Plugin):
     """Plugin que exibe uso de CPU"""
     
+    # Textos de 0% a 100% formatados uma única vez
+    _CPU_TEXT = tuple(f"CPU: {percent}%" for percent in range(101))
+    # Intervalo mínimo entre amostras: evita que a thread monopolize o GIL
+    _MIN_UPDATE_INTERVAL = 0.1
+    
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         super().__init__("cpu", config)
         self.cpu_usage = "CPU: 0%"
-        self.last_check = 0
         self.update_interval = 2.0
         self.show = True
         self.font = None
         self.position = (40, 35)
         self.font_size = 18
+        # Amostragem de CPU em thread separada (fora do loop de renderização)
+        self._sampler: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        # Máscara pré-renderizada do texto: ((x, y), máscara L)
+        self._text_sprite: Optional[Tuple[Tuple[int, int], Image.Image]] = None
+        # Máscaras já renderizadas por percentual (no máximo 101)
+        self._text_sprites: Dict[int, Tuple[Tuple[int, int], Image.Image]] = {}
     
     def initialize(self, app_config) -> bool:
         super().initialize(app_config)
         
-        self.update_interval = self.config.get('update_interval', 2.0)
+        cfg = self._parse_config(CPUConfig)
+        self.update_interval = max(cfg.update_interval, self._MIN_UPDATE_INTERVAL)
         
         # Usa posição da própria config do plugin, se disponível
         # Caso contrário, usa as configurações globais (para compatibilidade)
-        if 'position' in self.config:
-            self.position = tuple(self.config['position'])
+        if cfg.position is not None:
+            self.position = cfg.position
         elif hasattr(app_config, 'cpu_position'):
             self.position = app_config.cpu_position
         
-        if 'font_size' in self.config:
-            self.font_size = self.config['font_size']
+        if cfg.font_size is not None:
+            self.font_size = cfg.font_size
         elif hasattr(app_config, 'info_font_size'):
             self.font_size = app_config.info_font_size
         
-        if 'show' in self.config:
-            self.show = self.config['show']
-        elif 'show_by_default' in self.config:
-            self.show = self.config['show_by_default']
-        elif hasattr(app_config, 'show_cpu'):
-            self.show = app_config.show_cpu
+        if cfg.show is not None:
+            self.show = cfg.show
+        elif cfg.show_by_default is not None:
+            self.show = cfg.show_by_default
         else:
-            self.show = True  # Default visibility
+            self.show = getattr(app_config, 'show_cpu', True)
         
-        self.show_system = self.config.get('show_system', True)
+        self.show_system = cfg.show_system
         
         # Carrega fonte - primeiro tenta usar configuração do plugin, depois assets
         self.font = self._load_font(app_config)
         
+        self._text_sprites = {}
+        self._text_sprite = self._render_text(self.cpu_usage)
+        
+        # Inicia a amostragem de CPU
+        self._stop_event.clear()
+        self._sampler = threading.Thread(target=self._sampler_loop, daemon=True)
+        self._sampler.start()
+        
         return True
     
+    def _sampler_loop(self):
+        """Thread que atualiza o uso de CPU a cada update_interval"""
+        next_t = time.monotonic()
+        while not self._stop_event.is_set():
+            percent = min(int(psutil.cpu_percent(interval=None)), 100)
+            # Cada percentual é rasterizado uma única vez; a atribuição única
+            # garante que o loop principal sempre lê uma máscara completa
+            sprite = self._text_sprites.get(percent)
+            if sprite is None:
+                sprite = self._text_sprites[percent] = self._render_text(self._CPU_TEXT[percent])
+            self._text_sprite = sprite
+            self.cpu_usage = self._CPU_TEXT[percent]
+            # Agenda pelo horário absoluto para não acumular atraso entre amostras
+            next_t += self.update_interval
+            self._stop_event.wait(max(0.0, next_t - time.monotonic()))
+    
+    def _render_text(self, text: str) -> Tuple[Tuple[int, int], Image.Image]:
+        """
+        Rasteriza o texto em uma máscara de cobertura (modo L) do tamanho do
+        bbox. Desenhada com draw.bitmap, produz o mesmo resultado que
+        draw.text, sem refazer o layout e a rasterização a cada frame.
+        """
+        left, top, right, bottom = self.font.getbbox(text)
+        mask = Image.new('L', (max(1, right - left), max(1, bottom - top)))
+        ImageDraw.Draw(mask).text((-left, -top), text, font=self.font, fill=255)
+        x, y = self.position
+        return (x + left, y + top), mask
+    
     def _load_font(self, app_config) -> ImageFont.ImageFont:
-        """Carrega fonte a partir da configuração do plugin ou assets"""
+        """
+        Carrega fonte a partir da configuração do plugin ou assets.
+        
+        Usa ImageFont.truetype direto (sem cached_truetype): o texto é
+        rasterizado na thread de amostragem, e a face FreeType compartilhada
+        com os plugins da thread principal não é thread-safe.
+        """
         font = None
         
         # 1. Tenta carregar de caminho direto especificado no plugin config
@@ -76,11 +145,11 @@ class CPUPlugin(Plugin):
         # 2. Tenta encontrar por nome nos assets
         if 'font' in self.config and hasattr(app_config, 'assets'):
             font_name = self.config['font']
-            fonts_list = app_config.assets.get('fonts', [])
+            fonts_list = app_config.assets.get('fonts', ())
             for f in fonts_list:
-                if f.get('name') == font_name:
+                if f.name == font_name:
                     try:
-                        font = ImageFont.truetype(f.get('path'), self.font_size)
+                        font = ImageFont.truetype(f.path, self.font_size)
                         return font
                     except:
                         pass
@@ -100,13 +169,9 @@ class CPUPlugin(Plugin):
         if not self.show:
             return frame
         
-        # Atualiza CPU
-        if time.time() - self.last_check > self.update_interval:
-            cpu = psutil.cpu_percent()
-            self.cpu_usage = f"CPU: {int(cpu)}%"
-            self.last_check = time.time()
-        
-        draw.text(self.position, self.cpu_usage, font=self.font, fill=(0, 255, 0, 200))
+        # A máscara do texto é atualizada pela thread de amostragem
+        pos, mask = self._text_sprite
+        draw.bitmap(pos, mask, fill=(0, 255, 0, 200))
         
         return frame
     
@@ -120,3 +185,10 @@ class CPUPlugin(Plugin):
     def on_keypress(self, key: str) -> bool:
         """Manipula teclas pressionadas - delega para o sistema de atalhos do plugin."""
         return super().on_keypress(key)
+    
+    def cleanup(self):
+        """Para a thread de amostragem"""
+        self._stop_event.set()
+        if self._sampler is not None:
+            self._sampler.join(timeout=1.0)
+            self._sampler = None
@@ -15,18 +15,44 @@ Autor: OverlayX
 """
 
 import os
+from dataclasses import dataclass
 from typing import Optional, Dict, Any, Tuple
 from PIL import Image, ImageDraw
 
 from .base import Plugin
 
 
+@dataclass
+class OverlayConfig:
+    """Opções do plugin overlay (chaves da config do plugin)"""
+    file: str = 'moldura.png'  # Imagem (moldura, watermark, etc)
+    enabled: Optional[bool] = None  # None: usa show_by_default ou a configuração global
+    show_by_default: Optional[bool] = None
+    opacity: float = 1.0  # 0.0 a 1.0
+    position: Tuple[int, int] = (0, 0)
+    fit: bool = False
+    resize: float = 1.0  # Fator de redimensionamento (1.0 = original)
+    
+    def __post_init__(self):
+        if isinstance(self.position, list):
+            self.position = tuple(self.position)
+
+
 class OverlayPlugin(Plugin):
     """Plugin que aplica overlay (moldura/watermark) sobre o vídeo"""
     
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         super().__init__("overlay", config)
         self.overlay_image = None
+        # Overlay com a opacidade já aplicada (refeito quando a opacidade muda)
+        self._premul_overlay: Optional[Image.Image] = None
+        # Canal alpha do overlay acima, usado como máscara no paste
+        # (None quando o overlay é totalmente opaco)
+        self._overlay_mask: Optional[Image.Image] = None
+        # Planos RGB do overlay, colados em frames RGB (o alpha vai na máscara)
+        self._overlay_rgb: Optional[Image.Image] = None
+        # Deslocamento do recorte não transparente dentro do overlay
+        self._overlay_offset: Tuple[int, int] = (0, 0)
         self.file = "moldura.png"
         self.enabled = True
         self.opacity = 1.0
@@ -37,41 +63,88 @@ class OverlayPlugin(Plugin):
     def initialize(self, app_config) -> bool:
         super().initialize(app_config)
         
-        # Arquivo de imagem (pode ser moldura, watermark, etc)
-        self.file = self.config.get('file', 'moldura.png')
+        cfg = self._parse_config(OverlayConfig)
+        self.file = cfg.file
         
         # Usa enabled da própria config do plugin
-        if 'enabled' in self.config:
-            self.enabled = self.config['enabled']
-        elif 'show_by_default' in self.config:
-            self.enabled = self.config['show_by_default']
-        elif hasattr(app_config, 'overlay_enabled'):
-            self.enabled = app_config.overlay_enabled
+        if cfg.enabled is not None:
+            self.enabled = cfg.enabled
+        elif cfg.show_by_default is not None:
+            self.enabled = cfg.show_by_default
         else:
-            self.enabled = True  # Default visibility
-        
-        # Opacidade (0.0 a 1.0)
-        self.opacity = self.config.get('opacity', 1.0)
-        
-        # Posição do overlay [x, y]
-        pos = self.config.get('position', [0, 0])
-        self.position = tuple(pos) if isinstance(pos, list) else pos
+            self.enabled = getattr(app_config, 'overlay_enabled', True)
         
-        # Flags de redimensionamento
-        self.fit = self.config.get('fit', False)
-        self.resize = self.config.get('resize', 1.0)
+        self.opacity = cfg.opacity
+        self.position = cfg.position
+        self.fit = cfg.fit
+        self.resize = cfg.resize
         
         # Carrega overlay
         if os.path.exists(self.file):
-            self.overlay_image = Image.open(self.file).convert('RGBA')
+            # convert() decodifica os pixels de uma vez (sem decode preguiçoso
+            # no primeiro frame) e o arquivo é fechado logo em seguida
+            with Image.open(self.file) as image:
+                self.overlay_image = image.convert('RGBA')
             
             # Aplica redimensionamento conforme as flags
             self.overlay_image = self._apply_resize(self.overlay_image, app_config)
+            
+            # Aplica a opacidade uma única vez (e não a cada frame)
+            self._update_premul_overlay()
         else:
             print(f"Aviso: Arquivo de overlay não encontrado: {self.file}")
         
         return True
     
+    @property
+    def opacity(self) -> float:
+        return self._opacity
+    
+    @opacity.setter
+    def opacity(self, value: float):
+        self._opacity = value
+        self._update_premul_overlay()
+    
+    def _update_premul_overlay(self):
+        """
+        Gera o overlay com a opacidade aplicada ao canal alpha.
+        
+        O overlay é recortado para a região com alpha > 0 (pixels totalmente
+        transparentes não alteram o frame), reduzindo a área misturada a cada
+        frame em molduras e watermarks. Se o recorte for totalmente opaco, o
+        paste é feito sem máscara (cópia direta).
+        """
+        self._premul_overlay = None
+        self._overlay_mask = None
+        self._overlay_rgb = None
+        self._overlay_offset = (0, 0)
+        if self.overlay_image is None:
+            return
+        
+        if self.opacity < 1.0:
+            # Tabela de 256 entradas aplicada direto pelo PIL (sem callback Python)
+            alpha_lut = bytes(min(255, round(i * self.opacity)) for i in range(256))
+            overlay = self.overlay_image.copy()
+            alpha = overlay.getchannel('A')
+            alpha = alpha.point(alpha_lut)
+            overlay.putalpha(alpha)
+        else:
+            overlay = self.overlay_image
+            alpha = overlay.getchannel('A')
+        
+        bbox = alpha.getbbox()
+        if bbox is None:
+            # Totalmente transparente: nada a desenhar
+            return
+        if bbox != (0, 0) + overlay.size:
+            overlay = overlay.crop(bbox)
+            alpha = alpha.crop(bbox)
+        
+        self._premul_overlay = overlay
+        self._overlay_mask = None if alpha.getextrema() == (255, 255) else alpha
+        self._overlay_rgb = overlay.convert('RGB')
+        self._overlay_offset = bbox[:2]
+    
     def _apply_resize(self, image: Image.Image, app_config) -> Image.Image:
         """
         Aplica redimensionamento baseado nas flags fit e resize.
@@ -97,18 +170,15 @@ class OverlayPlugin(Plugin):
         return image
     
     def process_frame(self, frame: Image.Image, draw: ImageDraw.Draw) -> Image.Image:
-        if not self.enabled or self.overlay_image is None:
+        if not self.enabled or self._premul_overlay is None:
             return frame
         
-        if self.opacity < 1.0:
-            # Aplica opacidade
-            overlay_copy = self.overlay_image.copy()
-            alpha = overlay_copy.split()[3]
-            alpha = alpha.point(lambda p: p * self.opacity)
-            overlay_copy.putalpha(alpha)
-            frame.paste(overlay_copy, self.position, mask=overlay_copy)
-        else:
-            frame.paste(self.overlay_image, self.position, mask=self.overlay_image)
+        x, y = self.position
+        dx, dy = self._overlay_offset
+        # Frames RGB recebem só os planos RGB (menos bytes lidos por pixel);
+        # em frames RGBA o overlay RGBA é mantido para misturar também o alpha
+        overlay = self._overlay_rgb if frame.mode == 'RGB' else self._premul_overlay
+        frame.paste(overlay, (x + dx, y + dy), mask=self._overlay_mask)
         
         return frame
     
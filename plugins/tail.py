@@ -7,18 +7,80 @@ Plugin que exibe o conteúdo de um arquivo em tempo real (similar ao tail -f).
 Autor: OverlayX
 """
 
+import io
+import mmap
 import os
 import sys
-import time
-from typing import Optional, Dict, Any, List
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from itertools import islice
+from typing import Optional, Dict, Any, List, Tuple, Callable
 from PIL import Image, ImageDraw, ImageFont
 
-from .base import Plugin
+from .base import Plugin, cached_truetype
+
+try:
+    from watchdog.observers import Observer
+except ImportError:
+    # watchdog é opcional: sem ele o arquivo é verificado por polling (stat)
+    Observer = None
+
+
+def _to_rgba(color, default: Tuple[int, ...]) -> Tuple[int, ...]:
+    """Cor [R, G, B, A] ou [R, G, B] (alpha completo) como tupla RGBA"""
+    if len(color) == 4:
+        return tuple(color)
+    if len(color) == 3:
+        return tuple(color) + (255,)
+    return default
+
+
+@dataclass
+class TailConfig:
+    """Opções do plugin tail (chaves da config do plugin)"""
+    file: str = ''
+    position: Tuple[int, int] = (50, 50)
+    width: int = 400
+    height: int = 200
+    font_size: int = 14
+    text_color: Tuple[int, ...] = (255, 255, 255, 255)
+    background_color: Tuple[int, ...] = (0, 0, 0, 255)  # Opacidade aplicada depois
+    opacity: float = 1.0  # Transparência do fundo (0.0 a 1.0)
+    lines: int = 10  # Número de linhas a mostrar
+    update_interval: float = 0.5  # Intervalo de atualização em segundos
+    show: Optional[bool] = None  # None: usa show_by_default
+    show_by_default: bool = True
+    breakline: bool = False  # Se True, quebra linha; se False, trunca com "..."
+    following: bool = True  # Se True, tail -f (últimas linhas); se False, primeiras linhas
+    
+    def __post_init__(self):
+        self.position = tuple(self.position)
+        self.text_color = _to_rgba(self.text_color, TailConfig.text_color)
+        self.background_color = _to_rgba(self.background_color, TailConfig.background_color)
+
+
+class _FileChangeHandler:
+    """Marca o TailPlugin para releitura quando o arquivo observado muda"""
+    
+    def __init__(self, plugin: 'TailPlugin'):
+        self.plugin = plugin
+        self.path = os.path.abspath(plugin.file_path)
+    
+    def dispatch(self, event):
+        """Chamado pelo Observer do watchdog para cada evento no diretório"""
+        for path in (event.src_path, getattr(event, 'dest_path', '')):
+            if path and os.path.abspath(path) == self.path:
+                self.plugin._dirty = True
+                return
 
 
 class TailPlugin(Plugin):
     """Plugin que exibe o conteúdo de um arquivo em tempo real (tail -f)"""
     
+    # A partir deste tamanho o arquivo é mapeado em memória (modo following);
+    # abaixo dele é lido inteiro de uma vez
+    _MMAP_THRESHOLD = 64 * 1024
+    
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         super().__init__("tail", config)
         
@@ -49,15 +111,27 @@ class TailPlugin(Plugin):
         
         # Estado interno
         self._last_file_size: int = 0
-        self._last_mtime: float = 0
+        self._last_mtime_ns: int = 0
         self._content: List[str] = []
-        self._last_update: float = 0  # Initialize to 0 so first update always runs
+        # Linhas prontas para desenhar: ((x, y), texto)
+        self._rendered_lines: List[Tuple[Tuple[int, int], str]] = []
+        self._bg_box: Optional[Image.Image] = None  # Caixa de fundo pronta (cor + opacidade)
+        # Leitura do arquivo em thread separada: o loop de renderização não
+        # espera pelo disco; o conteúdo novo é aplicado no próximo frame
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending_read: Optional[Future] = None
+        self._loaded_content: Optional[List[str]] = None
+        # Observador de mudanças do arquivo (watchdog); sem ele, relê por polling
+        self._observer = None
+        self._dirty: bool = False
     
     def initialize(self, app_config) -> bool:
         super().initialize(app_config)
         
+        cfg = self._parse_config(TailConfig)
+        
         # Carrega configurações do arquivo
-        self.file_path = self.config.get('file', '')
+        self.file_path = cfg.file
         if not self.file_path:
             print("Erro: Plugin 'tail' requer configuração 'file' (caminho do arquivo)")
             return False
@@ -66,71 +140,36 @@ class TailPlugin(Plugin):
         if not os.path.exists(self.file_path):
             print(f"Aviso: Arquivo '{self.file_path}' não existe. O plugin será habilitado quando o arquivo for criado.")
         
-        # Posição
-        if 'position' in self.config:
-            self.position = tuple(self.config['position'])
-        
-        # Tamanho da caixa de texto
-        if 'width' in self.config:
-            self.width = self.config['width']
-        if 'height' in self.config:
-            self.height = self.config['height']
-        
-        # Configurações de fonte
-        if 'font_size' in self.config:
-            self.font_size = self.config['font_size']
-        
-        # Cor do texto (pode ser especificada como [R, G, B, A] ou [R, G, B])
-        if 'text_color' in self.config:
-            colors = self.config['text_color']
-            if len(colors) == 4:
-                self.text_color = tuple(colors)
-            elif len(colors) == 3:
-                self.text_color = tuple(colors) + (255,)
-        
-        # Cor de fundo (pode ser especificada como [R, G, B, A] ou [R, G, B])
-        # A opacidade é aplicada separadamente em process_frame
-        if 'background_color' in self.config:
-            colors = self.config['background_color']
-            if len(colors) == 4:
-                self.background_color = tuple(colors)
-            elif len(colors) == 3:
-                self.background_color = tuple(colors) + (255,)  # Alpha completo, opacity aplicada depois
+        self.position = cfg.position
+        self.width = cfg.width
+        self.height = cfg.height
+        self.font_size = cfg.font_size
+        self.text_color = cfg.text_color
+        # A opacidade é aplicada separadamente, na criação da caixa de fundo
+        self.background_color = cfg.background_color
+        self.opacity = cfg.opacity
+        self.lines = cfg.lines
+        self.update_interval = cfg.update_interval
+        self.show = cfg.show if cfg.show is not None else cfg.show_by_default
+        self.breakline = cfg.breakline
+        self.following = cfg.following
+        
+        # Cria a caixa de fundo uma única vez (tamanho, cor e opacidade não mudam)
+        if self.opacity < 1.0:
+            # Opacidade substitui o alpha da cor de fundo
+            bg_color = self.background_color[:3] + (min(255, round(255 * self.opacity)),)
         else:
-            self.background_color = (0, 0, 0, 255)  # Padrão: preto opaco
-        
-        # Opacity (transparência) - controla a transparência do fundo
-        # Valor de 0.0 (totalmente transparente) a 1.0 (opaco)
-        self.opacity = self.config.get('opacity', 1.0)
-        
-        # Número de linhas
-        if 'lines' in self.config:
-            self.lines = self.config['lines']
-        
-        # Intervalo de atualização
-        if 'update_interval' in self.config:
-            self.update_interval = self.config['update_interval']
-        
-        # Visibilidade
-        if 'show' in self.config:
-            self.show = self.config['show']
-        elif 'show_by_default' in self.config:
-            self.show = self.config['show_by_default']
-        
-        # Breakline: se True, quebra linha; se False, trunca com "..."
-        if 'breakline' in self.config:
-            self.breakline = self.config['breakline']
-        
-        # Following: se True, tail -f (seguir últimas linhas); se False, mostra primeiras linhas
-        if 'following' in self.config:
-            self.following = self.config['following']
+            bg_color = self.background_color
+        self._bg_box = Image.new('RGBA', (self.width, self.height), bg_color)
         
         # Carrega fonte
         self.font = self._load_font(app_config)
         
+        # Observa mudanças antes da primeira leitura para não perder eventos
+        self._start_watcher()
+        
         # Inicializa leitura do arquivo
         self._read_file()
-        self._last_update = time.time()  # Prevent redundant read on first frame
         
         return True
     
@@ -141,7 +180,7 @@ class TailPlugin(Plugin):
         # 1. Tenta carregar de caminho direto especificado no plugin config
         if 'font_path' in self.config:
             try:
-                font = ImageFont.truetype(self.config['font_path'], self.font_size)
+                font = cached_truetype(self.config['font_path'], self.font_size)
                 return font
             except OSError:
                 pass
@@ -149,11 +188,11 @@ class TailPlugin(Plugin):
         # 2. Tenta encontrar por nome nos assets
         if 'font' in self.config:
             self.font_name = self.config['font']
-            fonts_list = app_config.assets.get('fonts', [])
+            fonts_list = app_config.assets.get('fonts', ())
             for f in fonts_list:
-                if f.get('name') == self.font_name:
+                if f.name == self.font_name:
                     try:
-                        font = ImageFont.truetype(f.get('path'), self.font_size)
+                        font = cached_truetype(f.path, self.font_size)
                         return font
                     except OSError:
                         pass
@@ -184,7 +223,7 @@ class TailPlugin(Plugin):
         
         for font_path in font_paths:
             try:
-                font = ImageFont.truetype(font_path, self.font_size)
+                font = cached_truetype(font_path, self.font_size)
                 return font
             except OSError:
                 continue
@@ -192,158 +231,245 @@ class TailPlugin(Plugin):
         # 4. Ultimate fallback - PIL's default font
         return ImageFont.load_default()
     
+    def _read_last_lines(self) -> List[str]:
+        """
+        Lê as últimas N linhas a partir do fim do arquivo.
+        
+        Arquivos grandes são mapeados em memória e as quebras de linha são
+        procuradas de trás para frente (rfind): só os bytes das últimas
+        linhas são copiados, independente do tamanho do arquivo.
+        """
+        with open(self.file_path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            # lines <= 0 lê o arquivo inteiro e aplica o mesmo fatiamento,
+            # independente do tamanho (a busca reversa só vale para N > 0)
+            if self.lines <= 0 or size < self._MMAP_THRESHOLD:
+                data = f.read()
+            else:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    # A (N+1)-ésima quebra a partir do fim marca o início das N linhas
+                    # (a quebra final do arquivo conta como uma delas)
+                    pos = len(mm)
+                    for _ in range(self.lines + 1):
+                        pos = mm.rfind(b'\n', 0, pos)
+                        if pos < 0:
+                            break
+                    data = mm[pos + 1:]
+        
+        # Separa as linhas como a leitura em modo texto (newlines universais)
+        text = data.decode('utf-8', errors='replace')
+        return io.StringIO(text, newline=None).readlines()[-self.lines:]
+    
     def _read_file(self):
-        """Lê o conteúdo do arquivo (similar ao tail)"""
-        if not os.path.exists(self.file_path):
-            self._content = [f"[Arquivo não encontrado: {self.file_path}]"]
+        """Lê o conteúdo do arquivo (similar ao tail) e atualiza o layout"""
+        content = self._load_content()
+        if content is not None:
+            self._content = content
+            self._update_layout()
+    
+    def _start_watcher(self):
+        """
+        Observa o diretório do arquivo com watchdog (inotify/FSEvents/
+        ReadDirectoryChangesW): o arquivo só é relido quando muda, sem stat
+        periódico. Sem watchdog (ou se a observação falhar) mantém o polling.
+        """
+        if Observer is None:
             return
-        
         try:
+            observer = Observer()
+            observer.schedule(_FileChangeHandler(self),
+                              os.path.dirname(os.path.abspath(self.file_path)))
+            observer.daemon = True
+            observer.start()
+        except Exception as e:
+            print(f"Aviso: não foi possível observar '{self.file_path}' ({e}), usando polling")
+            return
+        self._observer = observer
+    
+    def _read_file_async(self):
+        """Agenda a leitura do arquivo na thread de I/O (uma leitura por vez)"""
+        if self._pending_read is not None and not self._pending_read.done():
+            return
+        # Com watchdog, só relê se houve evento no arquivo
+        if self._observer is not None:
+            if not self._dirty:
+                return
+            self._dirty = False
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='tail')
+        self._pending_read = self._executor.submit(self._load_content)
+        self._pending_read.add_done_callback(self._on_content_loaded)
+    
+    def _on_content_loaded(self, future: Future):
+        """Guarda o conteúdo lido (atribuição única, lida pelo loop principal)"""
+        content = future.result()
+        if content is not None:
+            self._loaded_content = content
+    
+    def _load_content(self) -> Optional[List[str]]:
+        """Lê as linhas do arquivo. Retorna None se o arquivo não mudou."""
+        try:
+            # Um único stat por leitura: FileNotFoundError indica arquivo ausente
             stat = os.stat(self.file_path)
             file_size = stat.st_size
-            mtime = stat.st_mtime
+            mtime_ns = stat.st_mtime_ns
             
-            # Se o arquivo não mudou, não relê
-            if file_size == self._last_file_size and mtime == self._last_mtime:
-                return
+            # Se o arquivo não mudou (mesmo tamanho e mtime em nanossegundos), não relê
+            if file_size == self._last_file_size and mtime_ns == self._last_mtime_ns:
+                return None
             
             self._last_file_size = file_size
-            self._last_mtime = mtime
-            
-            # Lê o arquivo
-            with open(self.file_path, 'r', encoding='utf-8', errors='replace') as f:
-                all_lines = f.readlines()
+            self._last_mtime_ns = mtime_ns
             
             # Pega as linhas conforme modo following:
-            # following=True: últimas N linhas (tail -f)
-            # following=False: primeiras N linhas
+            # following=True: últimas N linhas (tail -f), lidas a partir do fim do arquivo
+            # following=False: primeiras N linhas, lidas do início sem ler o resto
             if self.following:
-                self._content = all_lines[-self.lines:] if len(all_lines) > self.lines else all_lines
+                content = self._read_last_lines()
             else:
-                self._content = all_lines[:self.lines] if len(all_lines) > self.lines else all_lines
+                with open(self.file_path, 'r', encoding='utf-8', errors='replace') as f:
+                    content = list(islice(f, self.lines))
             
             # Remove quebras de linha extras
-            self._content = [line.rstrip('\n\r') for line in self._content]
+            return [line.rstrip('\n\r') for line in content]
             
+        except FileNotFoundError:
+            return [f"[Arquivo não encontrado: {self.file_path}]"]
         except Exception as e:
-            self._content = [f"[Erro ao ler arquivo: {e}]"]
+            return [f"[Erro ao ler arquivo: {e}]"]
     
-    def update(self, delta_time: float):
-        """Atualiza o conteúdo do arquivo periodicamente"""
-        current_time = time.time()
-        
-        if current_time - self._last_update >= self.update_interval:
-            self._read_file()
-            self._last_update = current_time
+    def _get_text_width(self, text: str) -> float:
+        """Helper to get text width"""
+        try:
+            bbox = self.font.getbbox(text)
+            return bbox[2] - bbox[0]
+        except Exception:
+            return len(text) * self.font_size * 0.6
     
-    def process_frame(self, frame: Image.Image, draw: ImageDraw.Draw) -> Image.Image:
-        if not self.show:
-            return frame
-        
-        # Converte para RGBA para suportar transparência
-        frame = frame.convert('RGBA')
-        
-        # Cria imagem de fundo separada com opacidade aplicada (como em OverlayPlugin)
-        if self.opacity < 1.0:
-            # Cria imagem de fundo com a cor base
-            bg_box = Image.new('RGBA', 
-                (self.width, self.height), 
-                self.background_color[:3] + (255,))  # Alpha 255, depois aplica opacity
-            
-            # Aplica opacidade à imagem de fundo
-            alpha = bg_box.split()[3]
-            alpha = alpha.point(lambda p: p * self.opacity)
-            bg_box.putalpha(alpha)
-        else:
-            # Sem opacidade, usa direto
-            bg_box = Image.new('RGBA', 
-                (self.width, self.height), 
-                self.background_color)
+    def _wrap_text(self, text: str, max_width: int) -> List[str]:
+        """Word wrap text to fit within max_width"""
+        get_text_width = self._get_text_width
+        if get_text_width(text) <= max_width:
+            return [text]
+        
+        wrapped = []
+        current_line = ""
+        
+        for word in text.split():
+            test_line = current_line + (" " if current_line else "") + word
+            if get_text_width(test_line) <= max_width:
+                current_line = test_line
+            else:
+                if current_line:
+                    wrapped.append(current_line)
+                # Try single word that's too wide
+                if get_text_width(word) > max_width:
+                    # Force break the long word
+                    chars = []
+                    for char in word:
+                        test = "".join(chars) + char
+                        if get_text_width(test) > max_width:
+                            wrapped.append("".join(chars))
+                            chars = [char]
+                        else:
+                            chars.append(char)
+                    current_line = "".join(chars)
+                else:
+                    current_line = word
         
-        # Desenha a caixa de fundo usando paste com máscara alpha
-        frame.paste(bg_box, self.position, mask=bg_box)
+        if current_line:
+            wrapped.append(current_line)
         
-        # Cria novo draw object para o texto
-        draw = ImageDraw.Draw(frame)
+        return wrapped if wrapped else [text]
+    
+    def _truncate_to_width(self, line: str, max_width: int) -> str:
+        """
+        Trunca a linha com "..." no maior prefixo que cabe em max_width.
+        
+        Busca binária sobre o tamanho do prefixo (O(log n) medições em vez de
+        uma por caractere). Se nem um caractere couber, devolve a linha inteira.
+        """
+        lo, hi = 0, len(line)
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if self._get_text_width(line[:mid] + "...") <= max_width:
+                lo = mid
+            else:
+                hi = mid - 1
         
-        # Desenha as linhas de texto
+        return line[:lo] + "..." if lo > 0 else line
+    
+    def _update_layout(self):
+        """
+        Calcula a posição e o texto (quebrado ou truncado) de cada linha visível.
+        
+        Só depende do conteúdo, da fonte e do tamanho da caixa, então é refeito
+        quando o arquivo muda e não a cada frame.
+        """
+        rendered = []
+        x = self.position[0] + 5
         y_offset = self.position[1] + 5
         line_height = self.font_size + 2
         max_width = self.width - 10  # Margem de 5 pixels em cada lado
-        
-        def get_text_width(text):
-            """Helper to get text width"""
-            try:
-                bbox = draw.textbbox((0, 0), text, font=self.font)
-                return bbox[2] - bbox[0]
-            except Exception:
-                return len(text) * self.font_size * 0.6
-        
-        def wrap_text(text):
-            """Word wrap text to fit within max_width"""
-            if get_text_width(text) <= max_width:
-                return [text]
-            
-            wrapped = []
-            current_line = ""
-            
-            for word in text.split():
-                test_line = current_line + (" " if current_line else "") + word
-                if get_text_width(test_line) <= max_width:
-                    current_line = test_line
-                else:
-                    if current_line:
-                        wrapped.append(current_line)
-                    # Try single word that's too wide
-                    if get_text_width(word) > max_width:
-                        # Force break the long word
-                        chars = []
-                        for char in word:
-                            test = "".join(chars) + char
-                            if get_text_width(test) > max_width:
-                                wrapped.append("".join(chars))
-                                chars = [char]
-                            else:
-                                chars.append(char)
-                        current_line = "".join(chars)
-                    else:
-                        current_line = word
-            
-            if current_line:
-                wrapped.append(current_line)
-            
-            return wrapped if wrapped else [text]
+        max_y = self.position[1] + self.height - line_height
         
         for line in self._content:
             if self.breakline:
                 # Quebra a linha para caber
-                wrapped_lines = wrap_text(line)
-                for wrapped_line in wrapped_lines:
-                    if y_offset > self.position[1] + self.height - line_height:
+                for wrapped_line in self._wrap_text(line, max_width):
+                    if y_offset > max_y:
                         break
-                    draw.text((self.position[0] + 5, y_offset), wrapped_line, font=self.font, fill=self.text_color)
+                    rendered.append(((x, y_offset), wrapped_line))
                     y_offset += line_height
             else:
                 # Trunca com "..." (comportamento original)
-                text_width = get_text_width(line)
+                text_width = self._get_text_width(line)
                 
                 # Truncate if text exceeds box width
                 if text_width > max_width:
-                    # Binary search-like approach to find max chars that fit
-                    for i in range(len(line), 0, -1):
-                        truncated = line[:i]
-                        if get_text_width(truncated + "...") <= max_width:
-                            line = truncated + "..."
-                            break
+                    line = self._truncate_to_width(line, max_width)
                 # else: line stays as-is (no truncation needed)
                 
-                draw.text((self.position[0] + 5, y_offset), line, font=self.font, fill=self.text_color)
+                rendered.append(((x, y_offset), line))
                 y_offset += line_height
             
             # Para se passar da altura máxima
-            if y_offset > self.position[1] + self.height - line_height:
+            if y_offset > max_y:
                 break
         
+        # Troca a lista inteira de uma vez
+        self._rendered_lines = rendered
+    
+    def periodic_tasks(self) -> List[Tuple[float, Callable[[], None]]]:
+        """Relê o arquivo a cada update_interval (agendado pelo PluginScheduler)"""
+        return [(self.update_interval, self._read_file_async)]
+    
+    def process_frame(self, frame: Image.Image, draw: ImageDraw.Draw) -> Image.Image:
+        # Aplica o conteúdo lido em segundo plano (o layout usa a fonte, que
+        # fica restrita a esta thread)
+        content = self._loaded_content
+        if content is not None:
+            self._loaded_content = None
+            self._content = content
+            self._update_layout()
+        
+        if not self.show:
+            return frame
+        
+        # Converte para RGBA para suportar transparência (só se necessário:
+        # a conversão aloca e copia o frame inteiro)
+        if frame.mode != 'RGBA':
+            frame = frame.convert('RGBA')
+            # Novo frame: precisa de um novo draw object para o texto
+            draw = ImageDraw.Draw(frame)
+        
+        # Desenha a caixa de fundo usando paste com máscara alpha
+        frame.paste(self._bg_box, self.position, mask=self._bg_box)
+        
+        # Desenha as linhas de texto (layout já calculado em _update_layout)
+        for xy, line in self._rendered_lines:
+            draw.text(xy, line, font=self.font, fill=self.text_color)
+        
         return frame
     
     def handle_shortcut(self, action: str) -> bool:
@@ -356,3 +482,13 @@ class TailPlugin(Plugin):
     def on_keypress(self, key: str) -> bool:
         """Manipula teclas pressionadas - delega para o sistema de atalhos do plugin."""
         return super().on_keypress(key)
+    
+    def cleanup(self):
+        """Encerra a observação e a thread de leitura do arquivo"""
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout=1.0)
+            self._observer = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -19,21 +19,69 @@ Referência: https://www.first.org/tlp/
 Autor: OverlayX
 """
 
+import os
+from functools import lru_cache
+from types import MappingProxyType
 from typing import Optional, Dict, Any
 from PIL import Image, ImageDraw, ImageFont
 
-from .base import Plugin
+from .base import Plugin, cached_truetype
+
+
+# Fontes de sistema (macOS) tentadas quando o config não define uma fonte
+_FALLBACK_FONTS = ("/System/Library/Fonts/Menlo.ttc", "/System/Library/Fonts/SFNS.ttf")
+
+
+@lru_cache(maxsize=None)
+def _resolve_fallback() -> Optional[str]:
+    """
+    Caminho da fonte de fallback, procurado uma única vez por processo
+    (None: usar ImageFont.load_default).
+    """
+    for path in _FALLBACK_FONTS:
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+@lru_cache(maxsize=None)
+def _default_font() -> ImageFont.ImageFont:
+    """ImageFont.load_default compartilhada (um objeto só: chave de _shared_tiles)"""
+    return ImageFont.load_default()
+
+
+# Renderizações independentes da posição, compartilhadas entre instâncias:
+# (fonte, padding, nível) -> (tiles, canto do tile, sobra do texto, cor, área).
+# cached_truetype devolve o mesmo objeto de fonte para o mesmo caminho e
+# tamanho, então instâncias com a mesma fonte rasterizam cada nível uma vez.
+_SHARED_TILES_MAX = 32
+_shared_tiles: Dict[tuple, tuple] = {}
 
 
 class TLPPlugin(Plugin):
     """Plugin que exibe classificação TLP"""
     
+    # Sem __dict__: acesso mais rápido a show/tlp_level no process_frame
+    __slots__ = ('tlp_level', 'font', 'position', 'font_size', 'show', 'padding',
+                 '_cache', '_key_to_action')
+    
     # Constantes de classificação TLP
     TLP_RED = "RED"
     TLP_AMBER = "AMBER"
     TLP_GREEN = "GREEN"
     TLP_CLEAR = "CLEAR"
     
+    # Níveis aceitos por _validate_tlp_level
+    _VALID_LEVELS = frozenset((TLP_RED, TLP_AMBER, TLP_GREEN, TLP_CLEAR))
+    
+    # Texto exibido para cada nível TLP
+    _LABELS = {
+        TLP_RED: "TLP:RED",
+        TLP_AMBER: "TLP:AMBER",
+        TLP_GREEN: "TLP:GREEN",
+        TLP_CLEAR: "TLP:CLEAR",
+    }
+    
     # Mapeamento de cores para cada nível TLP
     # Formato: (text_color, background_color)
     TLP_COLORS = {
@@ -43,12 +91,21 @@ class TLPPlugin(Plugin):
         TLP_CLEAR: ((255, 255, 255), (0, 0, 0)),   # White text on black background
     }
     
-    # Atalhos para mudança de classificação
-    TLP_SHORTCUTS = {
+    # Atalhos para mudança de classificação (somente leitura: usados direto
+    # como self.shortcuts; atalhos vindos do config continuam um dict comum)
+    TLP_SHORTCUTS = MappingProxyType({
         'red': 'r',
         'amber': 'a', 
         'green': 'g',
         'clear': 'l',  # 'l' for "liberado" / clear
+    })
+    
+    # Ação de atalho -> nível TLP
+    _ACTION_TO_LEVEL = {
+        'red': TLP_RED,
+        'amber': TLP_AMBER,
+        'green': TLP_GREEN,
+        'clear': TLP_CLEAR,
     }
     
     def __init__(self, config: Optional[Dict[str, Any]] = None):
@@ -59,6 +116,11 @@ class TLPPlugin(Plugin):
         self.font_size = 18
         self.show = True
         self.padding = 8
+        # Tiles pré-renderizados (fundo + texto) por nível, feitos no initialize
+        self._cache: Dict[str, tuple] = {}
+        # Índice tecla -> ação dos atalhos (refeito quando self.shortcuts muda)
+        self._key_to_action: Dict[str, str] = {}
+        self._build_key_to_action()
     
     def initialize(self, app_config) -> bool:
         super().initialize(app_config)
@@ -91,22 +153,38 @@ class TLPPlugin(Plugin):
         # Carrega fonte
         self.font = self._load_font(app_config)
         
+        # Renderiza os quatro níveis uma única vez (fonte fixa daqui em diante)
+        levels = (self.TLP_RED, self.TLP_AMBER, self.TLP_GREEN, self.TLP_CLEAR)
+        self._cache = {level: self._render_tile(level) for level in levels}
+        
         # Adiciona atalhos para mudança de classificação se não especificados
         if not self.shortcuts:
-            self.shortcuts = dict(self.TLP_SHORTCUTS)
+            self.shortcuts = self.TLP_SHORTCUTS
+        self._build_key_to_action()
         
         return True
     
+    def _build_key_to_action(self):
+        """Monta o índice tecla -> ação (a primeira ação de cada tecla prevalece)"""
+        key_to_action: Dict[str, str] = {}
+        for action, shortcut_key in self.shortcuts.items():
+            try:
+                key_to_action.setdefault(shortcut_key, action)
+            except TypeError:
+                # Valor não hashable (ex.: lista no YAML) nunca casa com uma tecla
+                pass
+        self._key_to_action = key_to_action
+    
     def _validate_tlp_level(self, level: str) -> str:
         """Valida e retorna um nível TLP válido"""
-        level_upper = level.upper() if isinstance(level, str) else self.TLP_CLEAR
-        valid_levels = [self.TLP_RED, self.TLP_AMBER, self.TLP_GREEN, self.TLP_CLEAR]
+        clear = self.TLP_CLEAR
+        level_upper = level.upper() if isinstance(level, str) else clear
         
-        if level_upper in valid_levels:
+        if level_upper in self._VALID_LEVELS:
             return level_upper
         
         print(f"Aviso: Nível TLP '{level}' não reconhecido. Usando TLP:CLEAR.")
-        return self.TLP_CLEAR
+        return clear
     
     def _load_font(self, app_config) -> ImageFont.ImageFont:
         """Carrega fonte a partir da configuração do plugin ou assets"""
@@ -115,7 +193,7 @@ class TLPPlugin(Plugin):
         # 1. Tenta carregar de caminho direto especificado no plugin config
         if 'font_path' in self.config:
             try:
-                font = ImageFont.truetype(self.config['font_path'], self.font_size)
+                font = cached_truetype(self.config['font_path'], self.font_size)
                 return font
             except FileNotFoundError:
                 pass
@@ -123,11 +201,11 @@ class TLPPlugin(Plugin):
         # 2. Tenta encontrar por nome nos assets
         if 'font' in self.config and hasattr(app_config, 'assets'):
             font_name = self.config['font']
-            fonts_list = app_config.assets.get('fonts', [])
+            fonts_list = app_config.assets.get('fonts', ())
             for f in fonts_list:
-                if f.get('name') == font_name:
+                if f.name == font_name:
                     try:
-                        font = ImageFont.truetype(f.get('path'), self.font_size)
+                        font = cached_truetype(f.path, self.font_size)
                         return font
                     except FileNotFoundError:
                         pass
@@ -135,47 +213,96 @@ class TLPPlugin(Plugin):
                         pass
         
         # 3. Fallback para fonte padrão do sistema (macOS)
-        try:
-            font = ImageFont.truetype("/System/Library/Fonts/Menlo.ttc", self.font_size)
-        except FileNotFoundError:
+        fallback_path = _resolve_fallback()
+        if fallback_path is not None:
             try:
-                font = ImageFont.truetype("/System/Library/Fonts/SFNS.ttf", self.font_size)
-            except (FileNotFoundError, OSError):
-                font = ImageFont.load_default()
-        except OSError:
-            font = ImageFont.load_default()
+                return cached_truetype(fallback_path, self.font_size)
+            except OSError:
+                pass
         
-        return font
+        return _default_font()
     
-    def process_frame(self, frame: Image.Image, draw: ImageDraw.Draw) -> Image.Image:
-        if not self.show:
-            return frame
+    def _render_tile(self, level: str):
+        """
+        Tile de um nível na posição do plugin.
         
-        # Formata o texto TLP
-        tlp_text = f"TLP:{self.tlp_level}"
+        Retorna o tile opaco do retângulo de fundo (com o texto já desenhado)
+        em cada modo de frame, colado sem máscara a cada frame, a parte do
+        texto que passa do retângulo (máscara de cobertura desenhada com
+        draw.bitmap, ou None), a cor do texto e a área desenhada. As posições
+        já estão em coordenadas do frame.
+        """
+        key = (self.font, self.padding, level)
+        shared = _shared_tiles.get(key)
+        if shared is None:
+            if len(_shared_tiles) >= _SHARED_TILES_MAX:
+                _shared_tiles.clear()
+            shared = _shared_tiles[key] = self._rasterize_tile(level)
+        tiles, (x1, y1), overflow, text_color, (left, top, right, bottom) = shared
         
-        # Obtém cores para o nível atual
-        text_color, bg_color = self.TLP_COLORS.get(
-            self.tlp_level, 
-            self.TLP_COLORS[self.TLP_CLEAR]
-        )
+        x, y = self.position
+        if overflow is not None:
+            mask, (mask_x, mask_y) = overflow
+            overflow = (mask, (x + mask_x, y + mask_y))
+        bounds = (x + left, y + top, x + right, y + bottom)
+        return tiles, (x + x1, y + y1), overflow, text_color, bounds
+    
+    def _rasterize_tile(self, level: str) -> tuple:
+        """Renderiza o fundo e o texto de um nível com o texto na origem"""
+        tlp_text = self._LABELS[level]
+        text_color, bg_color = self.TLP_COLORS.get(level, self.TLP_COLORS[self.TLP_CLEAR])
         
-        # Calcula bounding box do texto
-        bbox = draw.textbbox(self.position, tlp_text, font=self.font)
+        # Geometria com o texto na origem
+        probe = ImageDraw.Draw(Image.new('RGB', (1, 1)))
+        bbox = probe.textbbox((0, 0), tlp_text, font=self.font)
         text_width = bbox[2] - bbox[0]
         text_height = bbox[3] - bbox[1]
+        x1, y1 = -self.padding, -self.padding
+        x2, y2 = text_width + self.padding, text_height + self.padding
+        
+        # Cobertura do texto rasterizada uma única vez, em uma área que inclui
+        # o retângulo e o texto (que pode passar do retângulo)
+        left, top = min(x1, bbox[0]), min(y1, bbox[1])
+        right, bottom = max(x2 + 1, bbox[2]), max(y2 + 1, bbox[3])
+        mask = Image.new('L', (right - left, bottom - top), 0)
+        ImageDraw.Draw(mask).text((-left, -top), tlp_text, font=self.font, fill=255)
+        
+        # Retângulo de fundo (inclusivo) com a cor do texto aplicada pela
+        # cobertura (mesma operação de preenchimento usada por draw.text)
+        tile = Image.new('RGB', (x2 - x1 + 1, y2 - y1 + 1), bg_color)
+        tile.paste(text_color, (left - x1, top - y1), mask)
+        # Uma cópia por modo de frame: o paste sem máscara vira uma cópia
+        # direta (o PIL converteria o tile RGB a cada frame RGBA)
+        tiles = {'RGB': tile, 'RGBA': tile.convert('RGBA')}
+        
+        # Sobra só a cobertura fora do retângulo (fontes grandes com pouco padding)
+        mask.paste(0, (x1 - left, y1 - top, x2 - left + 1, y2 - top + 1))
+        overflow_bbox = mask.getbbox()
+        overflow = None
+        if overflow_bbox is not None:
+            overflow = (mask.crop(overflow_bbox),
+                        (left + overflow_bbox[0], top + overflow_bbox[1]))
+        
+        return tiles, (x1, y1), overflow, text_color, (left, top, right, bottom)
+    
+    def process_frame(self, frame: Image.Image, draw: ImageDraw.Draw) -> Image.Image:
+        if not self.show:
+            return frame
         
-        # Calcula retângulo de fundo com padding
-        x1 = self.position[0] - self.padding
-        y1 = self.position[1] - self.padding
-        x2 = self.position[0] + text_width + self.padding
-        y2 = self.position[1] + text_height + self.padding
+        # O texto só muda com o nível: tiles (com as cores já aplicadas)
+        # renderizados no initialize
+        tiles, tile_pos, overflow, text_color, (x1, y1, x2, y2) = self._cache[self.tlp_level]
         
-        # Desenha fundo preto
-        draw.rectangle([x1, y1, x2, y2], fill=bg_color)
+        # Fora do frame: nada a desenhar
+        width, height = frame.size
+        if x2 <= 0 or y2 <= 0 or x1 >= width or y1 >= height:
+            return frame
         
-        # Desenha texto
-        draw.text(self.position, tlp_text, font=self.font, fill=text_color)
+        # Fundo opaco: cópia direta, sem máscara
+        frame.paste(tiles.get(frame.mode, tiles['RGB']), tile_pos)
+        if overflow is not None:
+            mask, mask_pos = overflow
+            draw.bitmap(mask_pos, mask, fill=text_color)
         
         return frame
     
@@ -186,30 +313,20 @@ class TLPPlugin(Plugin):
             return True
         
         # Atalhos para mudança de classificação
-        action_lower = action.lower()
-        if action_lower == 'red':
-            self.tlp_level = self.TLP_RED
-            return True
-        elif action_lower == 'amber':
-            self.tlp_level = self.TLP_AMBER
-            return True
-        elif action_lower == 'green':
-            self.tlp_level = self.TLP_GREEN
-            return True
-        elif action_lower == 'clear':
-            self.tlp_level = self.TLP_CLEAR
+        level = self._ACTION_TO_LEVEL.get(action.lower())
+        if level is not None:
+            self.tlp_level = level
             return True
         
         return False
     
     def on_keypress(self, key: str) -> bool:
         """Manipula teclas pressionadas - delega para o sistema de atalhos do plugin."""
-        # Verifica se a tecla corresponde a alguma ação de atalho do plugin
-        if self.shortcuts:
-            for action, shortcut_key in self.shortcuts.items():
-                if key == shortcut_key:
-                    return self.handle_shortcut(action)
-        return False
+        # Uma consulta ao índice em vez de percorrer todos os atalhos
+        action = self._key_to_action.get(key)
+        if action is None:
+            return False
+        return self.handle_shortcut(action)
     
     def set_tlp_level(self, level: str) -> bool:
         """